@@ -0,0 +1,39 @@
+"""
+Micro-benchmark of the streaming extractor behind extract_next_links
+against the BeautifulSoup tree it replaced, on a page like the longest one
+in report.txt, with a paragraph and a link per line.
+
+Usage: python -m benchmarks.extract_bench [--tokens N] [--repeat R]
+"""
+import timeit
+import tracemalloc
+from argparse import ArgumentParser
+
+from benchmarks.tokenizer_bench import make_page
+from utils.extract import EXTRACTORS
+
+
+def make_html(n_tokens):
+    lines = make_page(n_tokens).split("\n")
+    body = "".join(f"<p>{line}</p><a href='/iterates/{i}'>line {i}</a>\n" for i, line in enumerate(lines))
+    return f"<html><head><script>var lines = {len(lines)};</script></head><body>{body}</body></html>".encode()
+
+
+def main(n_tokens, repeat):
+    html = make_html(n_tokens)
+    print(f"page: {len(html)} bytes")
+    for name, extract in EXTRACTORS.items():
+        best = min(timeit.repeat(lambda: extract(html), number=1, repeat=repeat))
+        tracemalloc.start()
+        extract(html)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name:>8}: {best * 1000:8.1f} ms, {peak / 2**20:6.1f} MiB peak")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=120029)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.tokens, args.repeat)
@@ -0,0 +1,87 @@
+"""
+Micro-benchmark of scraper.tokenize against the character by character
+tokenizer it replaced, on a page like the longest one in report.txt
+(prioriterates.txt, 120029 tokens: columns of numbers from MCMC iterates).
+
+Usage: python -m benchmarks.tokenizer_bench [--tokens N] [--repeat R]
+"""
+import random
+import re
+import timeit
+from argparse import ArgumentParser
+
+from scraper import tokenize, STOP_WORDS
+
+
+def make_page(n_tokens, seed=0):
+    """ Plain text of about n_tokens words, mostly numbers with a few words, as in the iterates file. """
+    rng = random.Random(seed)
+    words = ["beta", "sigma", "iteration", "the", "of", "prior", "mean", "a", "and", "theta"]
+    lines = []
+    count = 0
+    while count < n_tokens:
+        line = [f"{rng.uniform(-5, 5):.4f}" for _ in range(4)] + [rng.choice(words)]
+        lines.append("  ".join(line))
+        count += 9  # each number is two words, split at the decimal point
+    return "\n".join(lines)
+
+
+def legacy_tokenizer(content, allow_stop_words=False) -> list:
+    # scraper.tokenizer before the single pass tokenize(), kept for comparison
+    tokens = []
+    new_token = ""
+    for char in content:
+        text = str(char)
+        if not text:  # if 'text' is empty, every char in 'content' has been iterated over: check if 'new_token' is a valid word and add into 'tokens' if so
+            if not allow_stop_words:  # any words in the LEGACY_STOP_WORDS list won't be considered
+                if new_token and new_token not in LEGACY_STOP_WORDS and len(new_token) > 1 and not(new_token.isdigit()):  # if new_token is a valid word, then add it to the list of tokens found on this page
+                    tokens.append(new_token)
+                    break
+            else:
+                if new_token:
+                    tokens.append(new_token)
+                    break
+        if text.isalnum():  # if char is alphanumeric, add it to 'new_token' and continue checking for valid chars
+            new_token += text.lower()
+        else:  # else, for-loop has iterated over a full word: check if it's valid, and add to 'tokens' if so
+            if not allow_stop_words:  # any words in the LEGACY_STOP_WORDS list won't be considered
+                if new_token and new_token not in LEGACY_STOP_WORDS and len(new_token) > 1 and not(new_token.isdigit()):
+                    tokens.append(new_token)
+            else:
+                if new_token:
+                    tokens.append(new_token)
+            new_token = ""
+    return tokens
+
+
+LEGACY_STOP_WORDS = list(STOP_WORDS)  # the stop words used to be a list
+
+
+def legacy(text):
+    # How extract_next_links called it: once on the normalized text, once more for the length.
+    normalized = re.sub(r"\s+", " ", text.strip().lower())
+    return legacy_tokenizer(normalized), len(legacy_tokenizer(normalized, allow_stop_words=True))
+
+
+def chunked(text, size=64 * 1024):
+    return (text[i:i + size] for i in range(0, len(text), size))
+
+
+def main(n_tokens, repeat):
+    text = make_page(n_tokens)
+    tokens, word_count = tokenize(text)
+    print(f"page: {len(text)} chars, {word_count} words, {len(tokens)} tokens")
+    for name, func in (
+            ("legacy tokenizer x2", lambda: legacy(text)),
+            ("tokenize", lambda: tokenize(text)),
+            ("tokenize, 64KiB chunks", lambda: tokenize(chunked(text)))):
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f"{name:>24}: {best * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=120029)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.tokens, args.repeat)
@@ -0,0 +1,105 @@
+"""
+Micro-benchmark of the URLFilter behind scraper.is_valid against the regex
+checks it replaced, on a corpus of links.
+
+The corpus is read from a file with one url per line, or from the urls of a
+frontier save file, or else made up of links like the ones found on the
+ics.uci.edu pages.
+
+Usage: python -m benchmarks.urlfilter_bench [--corpus FILE | --save frontier.db] [--urls N] [--repeat R]
+"""
+import random
+import re
+import sqlite3
+import timeit
+from argparse import ArgumentParser
+from urllib.parse import urlparse
+
+from scraper import URL_FILTER
+
+
+def make_corpus(n_urls, seed=0):
+    """ Links like the ones on the crawled pages: mostly valid subdomains, some files and off-site links. """
+    rng = random.Random(seed)
+    hosts = ["www.ics.uci.edu", "ics.uci.edu", "archive.ics.uci.edu", "www.informatics.uci.edu",
+             "www.cs.uci.edu", "www.stat.uci.edu", "wics.ics.uci.edu", "www.google.com",
+             "github.com", "isg.ics.uci.edu"]
+    paths = ["/~dillenco/ics6d", "/people/faculty", "/files/pdf/brochure", "/research/areas",
+             "/wp-content/uploads/2019/05/poster.png", "/events/calendar/2024-01", "/about",
+             "/dataset/53/iris", "/pub/paper.ps", "/courses/cs121/slides.pptx"]
+    urls = []
+    for _ in range(n_urls):
+        url = f"{rng.choice(['https', 'http'])}://{rng.choice(hosts)}{rng.choice(paths)}"
+        if rng.random() < 0.2:
+            url += f"?page={rng.randrange(100)}"
+        urls.append(url)
+    return urls
+
+
+def read_corpus(corpus=None, save=None):
+    if corpus:
+        with open(corpus) as f:
+            return [line.strip() for line in f if line.strip()]
+    db = sqlite3.connect(save)
+    try:
+        return [url for (url,) in db.execute("SELECT url FROM urls")]
+    finally:
+        db.close()
+
+
+# scraper.is_valid's url rules before URLFilter, kept for comparison
+LEGACY_DOMAINS = {".ics.uci.edu", ".cs.uci.edu", ".informatics.uci.edu", ".stats.uci.edu"}
+LEGACY_PATHS = r".*/(pdf|css|js|png|jpe&g|uploads|upload|calendar|login)/*"
+LEGACY_EXTENSIONS = (
+    r".*\.(css|js|bmp|gif|jpe?g|ico"
+    + r"|png|tiff?|mid|mp2|mp3|mp4"
+    + r"|wav|avi|mov|mpeg|ram|m4v|mkv|ogg|ogv|pdf|/pdf/"
+    + r"|ps|eps|tex|ppt|pptx|ppsx|doc|docx|xls|xlsx|names"
+    + r"|data|dat|exe|bz2|tar|msi|bin|7z|psd|dmg|iso"
+    + r"|epub|dll|cnf|tgz|sha1"
+    + r"|thmx|mso|arff|rtf|jar|csv"
+    + r"|rm|smil|wmv|swf|wma|zip|rar|gz|odc)$")
+
+
+def legacy_is_valid(url) -> bool:
+    parsed = urlparse(url)
+    if parsed.scheme not in {"http", "https"}:
+        return False
+    for domain in LEGACY_DOMAINS:
+        if not parsed.hostname:
+            return False
+        if parsed.hostname.find(domain) > -1:
+            break
+    else:
+        return False
+    path = parsed.path.lower()
+    if re.match(LEGACY_PATHS, path):
+        return False
+    return not re.match(LEGACY_EXTENSIONS, path)
+
+
+def main(urls, repeat):
+    legacy = [legacy_is_valid(url) for url in urls]
+    new = URL_FILTER.is_valid_many(urls)
+    print(f"corpus: {len(urls)} urls, {sum(legacy)} valid before, {sum(new)} valid now, "
+          f"{sum(a != b for a, b in zip(legacy, new))} decisions changed")
+    for name, func in (
+            ("legacy regex checks", lambda: [legacy_is_valid(url) for url in urls]),
+            ("URL_FILTER.is_valid", lambda: [URL_FILTER.is_valid(url) for url in urls]),
+            ("URL_FILTER.is_valid_many", lambda: URL_FILTER.is_valid_many(urls))):
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f"{name:>26}: {best * 1000:8.1f} ms, {best / len(urls) * 1e6:6.2f} us/url")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--corpus", help="file with one url per line")
+    parser.add_argument("--save", help="frontier save file to read the urls from")
+    parser.add_argument("--urls", type=int, default=100000, help="size of the made up corpus")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    if args.corpus or args.save:
+        urls = read_corpus(args.corpus, args.save)
+    else:
+        urls = make_corpus(args.urls)
+    main(urls, args.repeat)
@@ -1,6 +1,7 @@
 from utils import get_logger
 from crawler.frontier import Frontier
 from crawler.worker import Worker
+from crawler.pipeline import ParsePipeline
 
 class Crawler(object):
     def __init__(self, config, restart, frontier_factory=Frontier, worker_factory=Worker):
@@ -9,10 +10,13 @@ class Crawler(object):
         self.frontier = frontier_factory(config, restart)
         self.workers = list()
         self.worker_factory = worker_factory
+        self.pipeline = (
+            ParsePipeline(self.frontier, config.parse_processes)
+            if config.parse_processes > 0 else None)
 
     def start_async(self):
         self.workers = [
-            self.worker_factory(worker_id, self.config, self.frontier)
+            self.worker_factory(worker_id, self.config, self.frontier, self.pipeline)
             for worker_id in range(self.config.threads_count)]
         for worker in self.workers:
             worker.start()
@@ -24,3 +28,5 @@ class Crawler(object):
     def join(self):
         for worker in self.workers:
             worker.join()
+        if self.pipeline:
+            self.pipeline.close()
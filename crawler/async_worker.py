@@ -0,0 +1,80 @@
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread
+
+from utils.aiodownload import ConnectionPool, download_async
+from utils import get_logger
+import scraper
+
+
+class AsyncWorker(Thread):
+    """
+    Worker that keeps config.async_requests downloads in flight from a
+    single event loop over a pool of keep-alive connections to the cache
+    server. Downloaded responses are handed to one scraping thread, so the
+    event loop keeps fetching while a page is parsed.
+
+    Pass it as the worker_factory of crawler.Crawler to use it instead of
+    crawler.worker.Worker. Responses go to the pipeline instead, if given.
+    """
+
+    def __init__(self, worker_id, config, frontier, pipeline=None):
+        self.logger = get_logger(f"Worker-{worker_id}", "Worker")
+        self.config = config
+        self.frontier = frontier
+        self.pipeline = pipeline
+        self.in_flight = max(1, config.async_requests)
+        super().__init__(daemon=True)
+
+    def run(self):
+        asyncio.run(self._crawl())
+
+    async def _crawl(self):
+        # get_tbd_url blocks, so every fetch task waits for it on its own thread.
+        self.frontier_pool = ThreadPoolExecutor(self.in_flight)
+        self.scrape_pool = ThreadPoolExecutor(1)
+        host, port = self.config.cache_server
+        self.connections = ConnectionPool(host, port, self.in_flight)
+        try:
+            await asyncio.gather(
+                *(self._fetch_loop() for _ in range(self.in_flight)))
+        finally:
+            await self.connections.close()
+            self.frontier_pool.shutdown()
+            self.scrape_pool.shutdown()
+        self.logger.info("Frontier is empty. Stopping Crawler.")
+
+    async def _fetch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            tbd_url = await loop.run_in_executor(
+                self.frontier_pool, self.frontier.get_tbd_url)
+            if not tbd_url:
+                break
+            try:
+                resp = await download_async(
+                    tbd_url, self.config, self.connections, self.logger)
+            except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+                self.frontier.release_url(tbd_url)
+                self.logger.error(f"Failed to download {tbd_url}: {e!r}")
+                continue
+            self.logger.info(
+                f"Downloaded {tbd_url}, status <{resp.status}>, "
+                f"using cache {self.config.cache_server}.")
+            await loop.run_in_executor(
+                self.scrape_pool, self._scrape, tbd_url, resp)
+
+    def _scrape(self, tbd_url, resp):
+        try:
+            if self.pipeline:
+                self.pipeline.submit(tbd_url, resp)
+                return
+            scraped_urls = scraper.scraper(tbd_url, resp)
+        except Exception:
+            self.frontier.release_url(tbd_url)
+            self.logger.exception(f"Failed to scrape {tbd_url}.")
+            return
+        for scraped_url in scraped_urls:
+            self.frontier.add_url(scraped_url)
+        self.frontier.mark_url_complete(tbd_url)
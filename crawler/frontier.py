@@ -1,18 +1,41 @@
 import os
-import shelve
+import time
 
-from threading import Thread, RLock
+from collections import deque
+from heapq import heappush, heappop
+from itertools import islice
+from threading import Thread, RLock, Condition
 from queue import Queue, Empty
+from urllib.parse import urlparse
 
 from utils import get_logger, get_urlhash, normalize
-from scraper import is_valid
+from utils.urlstore import SeenURLs
+from crawler.store import FrontierStore, delete_save_file
+from scraper import URL_FILTER, rules_fingerprint
 
 class Frontier(object):
+    resume_batch = 10000  # urls of the save file queued in memory at a time
+
     def __init__(self, config, restart):
         self.logger = get_logger("FRONTIER")
         self.config = config
-        self.to_be_downloaded = list()
-        
+        self.seen = SeenURLs()  # urlhashes of every url in the save file
+
+        # Per host politeness scheduling. Every host with urls waiting to be
+        # downloaded is either in ready_hosts, keyed by the earliest time it
+        # may be fetched again, or in busy_hosts while a worker has one of its
+        # urls. A host goes back into ready_hosts only when that url is
+        # completed, so no host is ever fetched by two workers at once.
+        self.lock = RLock()
+        self.has_work = Condition(self.lock)
+        self.host_queues = dict()  # format: {"hostname": deque of urls, ...}
+        self.ready_hosts = list()  # heap of (ready time, hostname)
+        self.busy_hosts = set()
+        self.next_fetch = dict()  # format: {"hostname": earliest next fetch time, ...}
+        self.in_progress = 0  # urls handed to workers and not yet completed
+        self.queued = 0  # urls in host_queues
+        self.resume = None  # iterator over urls of the save file not queued yet
+
         if not os.path.exists(self.config.save_file) and not restart:
             # Save file does not exist, but request to load save.
             self.logger.info(
@@ -22,10 +45,13 @@ class Frontier(object):
             # Save file does exists, but request to start from seed.
             self.logger.info(
                 f"Found save file {self.config.save_file}, deleting it.")
-            os.remove(self.config.save_file)
+            delete_save_file(self.config.save_file)
         # Load existing save file, or create one if it does not exist.
-        self.save = shelve.open(self.config.save_file)
+        self.save = FrontierStore(
+            self.config.save_file, self.config.save_batch,
+            self.config.save_interval)
         if restart:
+            self.save.set_meta("rules", rules_fingerprint())
             for url in self.config.seed_urls:
                 self.add_url(url)
         else:
@@ -38,35 +64,103 @@ class Frontier(object):
     def _parse_save_file(self):
         ''' This function can be overridden for alternate saving techniques. '''
         total_count = len(self.save)
-        tbd_count = 0
-        for url, completed in self.save.values():
-            if not completed and is_valid(url):
-                self.to_be_downloaded.append(url)
-                tbd_count += 1
+        for urlhash in self.save.keys():
+            self.seen.add(urlhash)
+        # Saved urls were valid when they were found. Only check them again if
+        # the rules have changed since, and then without is_valid's side effects.
+        fingerprint = rules_fingerprint()
+        if self.save.get_meta("rules") != fingerprint:
+            self.logger.info("Url rules changed, checking saved urls again.")
+            self.save.revalidate(URL_FILTER.is_valid_many)
+            self.save.set_meta("rules", fingerprint)
+        tbd_count = self.save.pending_count()
+        self.resume = self.save.pending_urls()
+        self._refill()
         self.logger.info(
             f"Found {tbd_count} urls to be downloaded from {total_count} "
             f"total urls discovered.")
 
     def get_tbd_url(self):
-        try:
-            return self.to_be_downloaded.pop()
-        except IndexError:
-            return None
+        ''' Blocks until some host may be fetched politely, and returns one of
+        its urls. Returns None once nothing is queued and no worker is still
+        downloading a page that could add more urls. '''
+        with self.has_work:
+            while True:
+                self._refill()
+                if self.ready_hosts:
+                    ready_time, host = self.ready_hosts[0]
+                    wait = ready_time - time.time()
+                    if wait <= 0:
+                        heappop(self.ready_hosts)
+                        self.busy_hosts.add(host)
+                        self.in_progress += 1
+                        self.queued -= 1
+                        return self.host_queues[host].popleft()
+                    self.has_work.wait(wait)
+                elif self.in_progress:
+                    self.has_work.wait()
+                else:
+                    # Crawl is over, commit what is still buffered.
+                    self.save.sync()
+                    return None
 
     def add_url(self, url):
         url = normalize(url)
         urlhash = get_urlhash(url)
-        if urlhash not in self.save:
-            self.save[urlhash] = (url, False)
-            self.save.sync()
-            self.to_be_downloaded.append(url)
-    
+        with self.lock:
+            if self.seen.add(urlhash):
+                self.save[urlhash] = (url, False)
+                self._enqueue(url)
+
     def mark_url_complete(self, url):
         urlhash = get_urlhash(url)
-        if urlhash not in self.save:
-            # This should not happen.
-            self.logger.error(
-                f"Completed url {url}, but have not seen it before.")
+        with self.lock:
+            if urlhash not in self.seen:
+                # This should not happen.
+                self.logger.error(
+                    f"Completed url {url}, but have not seen it before.")
+
+            self.save[urlhash] = (url, True)
+            self.release_url(url)
+
+    def release_url(self, url):
+        ''' Hands the host of a url given out by get_tbd_url back to the
+        scheduler, after the politeness delay. Called by mark_url_complete, and
+        directly by workers that give up on a url without completing it. '''
+        host = _get_host(url)
+        with self.has_work:
+            self.in_progress -= 1
+            self.busy_hosts.discard(host)
+            self.next_fetch[host] = time.time() + self.config.time_delay
+            if self.host_queues.get(host):
+                heappush(self.ready_hosts, (self.next_fetch[host], host))
+            else:
+                self.host_queues.pop(host, None)
+            self.has_work.notify_all()
+
+    def _refill(self):
+        ''' Streams more urls from the save file into the queues once few are
+        left, so a large save file is never loaded into memory at once. '''
+        if self.resume is None or self.queued >= self.resume_batch:
+            return
+        urls = list(islice(self.resume, self.resume_batch))
+        if len(urls) < self.resume_batch:
+            self.resume = None
+        for url in urls:
+            self._enqueue(url)
+
+    def _enqueue(self, url):
+        host = _get_host(url)
+        with self.has_work:
+            queue = self.host_queues.setdefault(host, deque())
+            queue.append(url)
+            self.queued += 1
+            if len(queue) == 1 and host not in self.busy_hosts:
+                # The host was idle, schedule it.
+                heappush(
+                    self.ready_hosts, (self.next_fetch.get(host, 0), host))
+                self.has_work.notify()
+
 
-        self.save[urlhash] = (url, True)
-        self.save.sync()
+def _get_host(url):
+    return urlparse(url).hostname or ""
@@ -0,0 +1,73 @@
+from concurrent.futures import ProcessPoolExecutor
+from queue import Queue
+from threading import Thread, BoundedSemaphore
+
+from utils import get_logger
+import scraper
+
+
+class ParsePipeline(object):
+    """
+    Parse stage of the crawler in a pool of processes, so parsing, tokenizing
+    and fingerprinting pages isn't held back by the GIL and scales with cores.
+
+    Workers hand their downloaded pages to submit() instead of scraping them.
+    Each page is parsed by scraper.parse_page in one of the processes, and a
+    merger thread applies the results in this process, in the order they
+    finish: scraper.apply_page adds them to the report statistics, then
+    their links are added to the frontier and the url is marked complete.
+    At most max_pending pages wait to be parsed or merged; submit() blocks
+    the worker until there is room, so memory stays bounded.
+    """
+
+    _STOP = object()
+
+    def __init__(self, frontier, processes, max_pending=None):
+        self.logger = get_logger("PIPELINE")
+        self.frontier = frontier
+        self.pool = ProcessPoolExecutor(processes)
+        self.slots = BoundedSemaphore(max_pending or 2 * processes)
+        self.results = Queue()  # format: (url, future of its PageResult) in the order they finish
+        self.merger = Thread(target=self._merge, daemon=True)
+        self.merger.start()
+
+    def submit(self, url, resp):
+        scraper.make_db()
+        if not scraper.needs_parsing(resp):
+            self.frontier.mark_url_complete(url)
+            return
+        self.slots.acquire()
+        try:
+            future = self.pool.submit(
+                scraper.parse_page, resp.raw_response.url, resp.raw_response.content)
+        except Exception:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda future: self.results.put((url, future)))
+
+    def close(self):
+        """
+        Wait for the pages submitted so far to be merged and stop the processes.
+        """
+        self.pool.shutdown()
+        self.results.put(self._STOP)
+        self.merger.join()
+
+    def _merge(self):
+        while True:
+            item = self.results.get()
+            if item is self._STOP:
+                break
+            url, future = item
+            try:
+                scraped_urls = scraper.apply_page(future.result())
+            except Exception:
+                # Free the host so the workers are not left waiting on it.
+                self.frontier.release_url(url)
+                self.logger.exception(f"Failed to scrape {url}.")
+                continue
+            finally:
+                self.slots.release()
+            for scraped_url in scraped_urls:
+                self.frontier.add_url(scraped_url)
+            self.frontier.mark_url_complete(url)
@@ -0,0 +1,144 @@
+import os
+import sqlite3
+import time
+
+# States of a url in the save file.
+PENDING = 0  # to be downloaded
+COMPLETED = 1  # downloaded
+REJECTED = 2  # not to be downloaded under the rules it was last checked with
+
+
+class FrontierStore(object):
+    """
+    Save file of the frontier: a SQLite database in WAL mode mapping
+    urlhash -> (url, completed), used in place of a shelve.
+
+    Writes are buffered and committed together in one transaction once
+    batch_size writes are pending or interval seconds have passed since the
+    last commit, so a crash loses at most that window of progress.
+    Urls still to be downloaded are kept in a separate partial index, so they
+    can be streamed back on restart without reading the whole save file.
+    Not thread safe on its own; the frontier serializes access to it.
+    """
+
+    def __init__(self, path, batch_size=500, interval=5.0):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.pending = dict()  # format: {urlhash: (url, completed), ...} not yet committed
+        self.last_commit = time.time()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS urls("
+            "urlhash TEXT PRIMARY KEY, url TEXT NOT NULL, completed INTEGER NOT NULL)")
+        self.db.execute(
+            f"CREATE INDEX IF NOT EXISTS pending_urls ON urls(completed) "
+            f"WHERE completed = {PENDING}")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS meta(key TEXT PRIMARY KEY, value TEXT)")
+        self.db.commit()
+
+    def __contains__(self, urlhash):
+        if urlhash in self.pending:
+            return True
+        return self.db.execute(
+            "SELECT 1 FROM urls WHERE urlhash = ?", (urlhash,)).fetchone() is not None
+
+    def __setitem__(self, urlhash, value):
+        self.pending[urlhash] = value
+        if (len(self.pending) >= self.batch_size or
+                time.time() - self.last_commit >= self.interval):
+            self.sync()
+
+    def __len__(self):
+        self.sync()
+        return self.db.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+
+    def keys(self):
+        self.sync()
+        for (urlhash,) in self.db.execute("SELECT urlhash FROM urls"):
+            yield urlhash
+
+    def values(self):
+        self.sync()
+        for url, completed in self.db.execute("SELECT url, completed FROM urls"):
+            yield url, completed == COMPLETED
+
+    def pending_count(self):
+        self.sync()
+        return self.db.execute(
+            "SELECT COUNT(*) FROM urls WHERE completed = ?", (PENDING,)).fetchone()[0]
+
+    def pending_urls(self, batch_size=1000):
+        ''' Streams the urls to be downloaded, batch_size rows at a time. Only
+        urls saved before the call are streamed, so the caller can keep adding
+        urls while reading. '''
+        self.sync()
+        (last,) = self.db.execute("SELECT MAX(rowid) FROM urls").fetchone()
+        rowid = 0
+        while last:
+            rows = self.db.execute(
+                "SELECT rowid, url FROM urls "
+                "WHERE completed = ? AND rowid > ? AND rowid <= ? "
+                "ORDER BY rowid LIMIT ?",
+                (PENDING, rowid, last, batch_size)).fetchall()
+            if not rows:
+                return
+            for rowid, url in rows:
+                yield url
+
+    def revalidate(self, check_many, batch_size=10000):
+        ''' Checks every url not downloaded yet again, batch_size urls at a
+        time with check_many(urls), which returns a boolean for each url, and
+        marks them pending or rejected accordingly. '''
+        self.sync()
+        rowid = 0
+        while True:
+            rows = self.db.execute(
+                "SELECT rowid, url FROM urls WHERE completed != ? AND rowid > ? "
+                "ORDER BY rowid LIMIT ?",
+                (COMPLETED, rowid, batch_size)).fetchall()
+            if not rows:
+                return
+            valid = check_many([url for _, url in rows])
+            with self.db:
+                self.db.executemany(
+                    "UPDATE urls SET completed = ? WHERE rowid = ?",
+                    ((PENDING if ok else REJECTED, rowid)
+                     for (rowid, _), ok in zip(rows, valid)))
+            rowid = rows[-1][0]
+
+    def get_meta(self, key):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)", (key, value))
+
+    def sync(self):
+        ''' Commits every pending write in one transaction. '''
+        if self.pending:
+            with self.db:
+                # Upsert rather than replace, so a url keeps its rowid and its
+                # place in pending_urls.
+                self.db.executemany(
+                    "INSERT INTO urls(urlhash, url, completed) VALUES (?, ?, ?) "
+                    "ON CONFLICT(urlhash) DO UPDATE SET completed = excluded.completed",
+                    ((urlhash, url, COMPLETED if completed else PENDING)
+                     for urlhash, (url, completed) in self.pending.items()))
+            self.pending.clear()
+        self.last_commit = time.time()
+
+    def close(self):
+        self.sync()
+        self.db.close()
+
+
+def delete_save_file(path):
+    ''' Deletes a save file along with the journal files SQLite keeps next to it. '''
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
@@ -12,10 +12,11 @@ import time
 
 
 class Worker(Thread):
-    def __init__(self, worker_id, config, frontier):
+    def __init__(self, worker_id, config, frontier, pipeline=None):
         self.logger = get_logger(f"Worker-{worker_id}", "Worker")
         self.config = config
         self.frontier = frontier
+        self.pipeline = pipeline  # crawler.pipeline.ParsePipeline to parse pages in, or None to parse them on this thread
         # basic check for requests in scraper
         assert {getsource(scraper).find(req) for req in {"from requests import", "import requests"}} == {-1}, "Do not use requests in scraper.py"
         assert {getsource(scraper).find(req) for req in {"from urllib.request import", "import urllib.request"}} == {-1}, "Do not use urllib.request in scraper.py"
@@ -30,30 +31,43 @@ class Worker(Thread):
             try:
                 resp = download(tbd_url, self.config, self.logger) #
             except ConnectionRefusedError:
+                self.frontier.release_url(tbd_url)
                 self.logger(f"Connection refused")
                 time.sleep(120)
                 continue
             except urllib3.exceptions.ConnectionError:
+                self.frontier.release_url(tbd_url)
                 self.logger(f"Connection error")
                 time.sleep(120)
                 continue
             except urllib3.exceptions.NewConnectionError:
+                self.frontier.release_url(tbd_url)
                 self.logger(f"Cant open new connection error")
                 time.sleep(120)
                 continue
             except urllib3.exceptions.MaxRetryError:
+                self.frontier.release_url(tbd_url)
                 self.logger(f"Reached max attempts")
                 time.sleep(120)
                 continue
             except requests.exceptions.ConnectionError:
+                self.frontier.release_url(tbd_url)
                 self.logger(f"Reached connection error for requests")
                 time.sleep(120)
                 continue
             self.logger.info(
                 f"Downloaded {tbd_url}, status <{resp.status}>, "
                 f"using cache {self.config.cache_server}.")
-            scraped_urls = scraper.scraper(tbd_url, resp)
+            try:
+                if self.pipeline:
+                    # The pipeline adds the links and completes the url once the page is parsed.
+                    self.pipeline.submit(tbd_url, resp)
+                    continue
+                scraped_urls = scraper.scraper(tbd_url, resp)
+            except Exception:
+                # Free the host so the other workers are not left waiting on it.
+                self.frontier.release_url(tbd_url)
+                raise
             for scraped_url in scraped_urls:
                 self.frontier.add_url(scraped_url)
             self.frontier.mark_url_complete(tbd_url)
-            time.sleep(self.config.time_delay)
@@ -4,6 +4,8 @@ from argparse import ArgumentParser
 from utils.server_registration import get_cache_server
 from utils.config import Config
 from crawler import Crawler
+from crawler.worker import Worker
+from crawler.async_worker import AsyncWorker
 
 
 
@@ -12,7 +14,8 @@ def main(config_file, restart):
     cparser.read(config_file)
     config = Config(cparser)
     config.cache_server = get_cache_server(config, restart)
-    crawler = Crawler(config, restart)
+    worker_factory = AsyncWorker if config.async_requests > 0 else Worker
+    crawler = Crawler(config, restart, worker_factory=worker_factory)
     crawler.start()
 
 if __name__ == "__main__":
@@ -1,43 +1,57 @@
 import re
-import hashlib
-import sqlite3
+import atexit
 import urllib.robotparser
-from bs4 import BeautifulSoup as BS
+from collections import Counter, namedtuple
+from threading import Lock
 from urllib.parse import urlparse, parse_qs
+from utils.urlstore import SeenURLs
+from utils.simhash import SimHashIndex, simhash
+from utils.digest import ContentDigests
+from utils.stats import CrawlStats, StatsWriter
+from utils.urlfilter import URLFilter
+from utils.extract import EXTRACTORS
+from utils import get_logger
 
 
 # SCRAPER GLOBAL VARIABLES
-DB_MADE = False # changes to True after first runthrough
-LONGEST_PAGE = ()  # ( format: page, number of words ) the page with the greatest number of words
-FREQ_DICT = {}  # dict of word-frequency pairs
-STOP_WORDS = ["a", "about", "above", "after", "again", "against", "all", "am", "an", "and",  "any", "are", "aren't", "as", "at", "be", "because", "been", "before", "being", "below", "between", "both", "but", "by", "can't", "cannot", "could", "couldn't", "did", "didn't", "do", "does", "doesn't", "doing","don't", "down", "during", "each", "few", "for", "from", "further", "had", "hadn't", "has", "hasn't", "have", "haven't", "having", "he", "he'd", "he'll", "he's", "her", "here", "here's", "hers", "herself", "him", "himself", "his", "how", "how's", "i", "i'd", "i'll", "i'm", "i've", "if", "in", "into", "is", "isn't", "it", "it's", "its", "itself", "let's", "me", "more", "most", "mustn't", "my", "myself", "no", "nor", "not", "of", "off", "on", "once", "only", "or", "other", "ought", "our", "ours", "ourselves", "out", "over", "own", "same", "shan't", "she", "she'd", "she'll", "she's", "should", "shouldn't", "so", "some", "such", "than", "that", "that's", "the", "their", "theirs", "them","themselves", "then", "there", "there's", "these", "they", "they'd", "they'll", "they're", "they've","this", "those", "through", "to", "too", "under", "until", "up", "very", "was", "wasn't", "we", "we'd","we'll", "we're", "we've", "were", "weren't", "what", "what's", "when", "when's", "where", "which", "while","who", "whom", "why", "with", "won't", "would", "wouldn't", "you", "you'd", "you'll", "you're", "you've", "your", "yours", "yourself", "yourselves"] # list of words that will not be considered for the top 50 most common words
-SD_COUNT = {}  # format: {"subdomain": count, ...}
-U_PAGES = set()  # Parsed urls
-PREVIOUS_HASH = [] # Hash where each int is an element of a binary number
+FREQ_SKETCH_WIDTH = None  # set to e.g. 2**20 to bound the memory of word counting; counts then become estimates
+STATS = StatsWriter(CrawlStats(FREQ_SKETCH_WIDTH), interval=5)  # report statistics (top 50 words, longest page, subdomains, unique pages, SimHash log), written to their files every 5 seconds by a background thread; started by make_db()
+STOP_WORDS = frozenset(["a", "about", "above", "after", "again", "against", "all", "am", "an", "and",  "any", "are", "aren't", "as", "at", "be", "because", "been", "before", "being", "below", "between", "both", "but", "by", "can't", "cannot", "could", "couldn't", "did", "didn't", "do", "does", "doesn't", "doing","don't", "down", "during", "each", "few", "for", "from", "further", "had", "hadn't", "has", "hasn't", "have", "haven't", "having", "he", "he'd", "he'll", "he's", "her", "here", "here's", "hers", "herself", "him", "himself", "his", "how", "how's", "i", "i'd", "i'll", "i'm", "i've", "if", "in", "into", "is", "isn't", "it", "it's", "its", "itself", "let's", "me", "more", "most", "mustn't", "my", "myself", "no", "nor", "not", "of", "off", "on", "once", "only", "or", "other", "ought", "our", "ours", "ourselves", "out", "over", "own", "same", "shan't", "she", "she'd", "she'll", "she's", "should", "shouldn't", "so", "some", "such", "than", "that", "that's", "the", "their", "theirs", "them","themselves", "then", "there", "there's", "these", "they", "they'd", "they'll", "they're", "they've","this", "those", "through", "to", "too", "under", "until", "up", "very", "was", "wasn't", "we", "we'd","we'll", "we're", "we've", "were", "weren't", "what", "what's", "when", "when's", "where", "which", "while","who", "whom", "why", "with", "won't", "would", "wouldn't", "you", "you'd", "you'll", "you're", "you've", "your", "yours", "yourself", "yourselves"]) # set of words that will not be considered for the top 50 most common words
+WORD_PATTERN = re.compile(r"[^\W_]+")  # a word is a run of alphanumeric chars, same as str.isalnum()
+U_PAGES = SeenURLs(lambda parsed: canonical_url(parsed))  # canonical keys of unique parsed urls
+SIMHASH_INDEX = None  # SimHashIndex of every page crawled, saved in hashes.db; made by make_db()
+SIMHASH_DISTANCE = 3  # pages whose 64-bit fingerprints differ in at most this many bits are near duplicates
+CONTENT_DIGESTS = None  # ContentDigests of recently crawled page bodies, saved in hashes.db; made by make_db()
+DB_LOCK = Lock()
+EXTRACT = EXTRACTORS["stream"]  # how text and links are taken out of a page: "stream" parses it in one pass, "soup" builds a BeautifulSoup tree
+EXTRACT_LIMIT = 16 * 1024 * 1024  # characters of a page parsed at most; the rest of a bigger page is ignored
+PageResult = namedtuple("PageResult", ["url", "word_count", "word_counts", "fingerprint", "links"])  # what parse_page() found on a page: its url, number of words, Counter of its tokens, SimHash fingerprint and valid links
 
 def make_db():
-    global DB_MADE
-    if not DB_MADE:
-        db = sqlite3.connect('hashes.db')  # implicitly create 'hashes.db' database if it doesn't exist, and create a connection to the db in the current working directory
-        cur = db.cursor()  # make a cursor to execute SQL statements and fetch results from SQL queries
-        try:
-            cur.execute("CREATE TABLE pages(hash);")  # create the 'pages' table of hash values
-        except sqlite3.OperationalError:
-            pass
-        cur.close()
-        DB_MADE = True
-    else:
-        return
+    global SIMHASH_INDEX, CONTENT_DIGESTS
+    with DB_LOCK:
+        if SIMHASH_INDEX is None:
+            SIMHASH_INDEX = SimHashIndex('hashes.db', SIMHASH_DISTANCE)  # implicitly create 'hashes.db' in the current working directory, and load the fingerprints of earlier runs
+            CONTENT_DIGESTS = ContentDigests('hashes.db')
+            STATS.start()
+            atexit.register(close_db)
+
+
+def close_db():
+    STATS.close()
+    SIMHASH_INDEX.flush()
+    CONTENT_DIGESTS.flush()
+    get_logger("SCRAPER").info(
+        f"Skipped parsing {CONTENT_DIGESTS.hits} exact duplicate pages, "
+        f"parsed {CONTENT_DIGESTS.misses}.")
 
 
 def scraper(url, resp) -> list:
     make_db()
-    links = extract_next_links(url, resp)
-    return [link for link in links if is_valid(link)]
+    return extract_next_links(url, resp)
 
 
 def extract_next_links(url, resp):
-    global PREVIOUS_HASH
     # url: the URL that was used to get the page
     # resp.url: the actual url of the page
     # resp.status: the status code returned by the server. 200 is OK, you got the page. Other numbers mean that there was some kind of problem.
@@ -46,224 +60,140 @@ def extract_next_links(url, resp):
     #         resp.raw_response.url: the url, again
     #         resp.raw_response.content: the content of the page!
     # Return a list with the hyperlinks (as strings) scrapped from resp.raw_response.content
-    found_links = [] # a list for storing found links
-    # Check to make sure that the current url is valid and the response status is good
-    if resp.status != 200:
-        return found_links
-    else:
-        # Get the html content of the page
-        # Using BeautifulSoup to parse the html, and then find all the links within it
-        page_content = resp.raw_response.content
-        soup = BS(page_content, 'html.parser')
-        
-        plain_text = str(soup.get_text())  # plain text of the page contents (gets rid of HTML elements)
-        plain_text = plain_text.strip().lower()  # remove leading & trailing whitespace, & lowercase all chars
-        normalized_text = re.sub(r'\s+', ' ', plain_text)  # sequences of whitespace replaced with one space
-        
-        tokens = tokenizer(normalized_text)  # tokenize the current page
-
-        if len(tokens) < 25:  # if the page is empty/low content
-            return found_links
-        
-        file = open("SimHashLog.txt", "a")
-        if sim_hash(PREVIOUS_HASH, tokens):
-            file.write(f"{resp.raw_response.url} : Page Similar\n")
-            file.close()
-            return found_links
-        file.write(f"{resp.raw_response.url} : Page Not Similar\n")
-        file.close()
-            
-
-        update_freq(tokens)  # update the token frequency dictionary
-        update_longest_page(normalized_text, resp.raw_response.url)  # update the longest page found
-        for soup_url in soup.find_all('a'):
-            link = soup_url.get('href')
-            if link not in found_links:
-                found_links.append(link)
-                    
-    return found_links
+    if not needs_parsing(resp):
+        return []
+    return apply_page(parse_page(resp.raw_response.url, resp.raw_response.content))
+
+
+def needs_parsing(resp) -> bool:
+    """
+    Return True if the response status is good and the page has a body not crawled before
+    (mirrors, ?share= and ?replytocom= variants have the same one).
+    """
+    return resp.status == 200 and not CONTENT_DIGESTS.add(resp.raw_response.content)
+
+
+def parse_page(url, page_content):
+    """
+    Parse the html of a page and return a PageResult, or None if the page is empty/low content.
+    Has no side effects, so pages can also be parsed in other processes (see crawler.pipeline);
+    apply_page() then adds the result to the report.
+    """
+    page = EXTRACT(page_content, EXTRACT_LIMIT)  # plain text of the page contents (gets rid of HTML elements) and its links
+    tokens, word_count = tokenize(page.text)  # tokenize the current page
+    if len(tokens) < 25:  # if the page is empty/low content
+        return None
+    word_counts = Counter(tokens)
+    links = list(dict.fromkeys(link.href for link in page.links))  # each link once, in page order
+    links = [link for link, valid in zip(links, URL_FILTER.is_valid_many(links)) if valid]
+    return PageResult(url, word_count, word_counts, simhash(word_counts), links)
+
+
+def apply_page(result) -> list:
+    """
+    Add the PageResult of a page to the report statistics, and return its links to crawl:
+    the unique ones, unless the page is a near duplicate of one crawled before.
+    """
+    if result is None:
+        return []
+    similar = sim_hash(result.fingerprint)
+    STATS.submit("log_similarity", result.url, similar)
+    if similar:
+        return []
+    update_freq(result.word_counts)  # update the token frequency dictionary
+    update_longest_page(result.word_count, result.url)  # update the longest page found
+    return [link for link in result.links if record_unique(link)]
 
 
 #SCRAPER FUNCTIONS----------------------------------------------------------------
 
-def tokenizer(content, allow_stop_words=False) -> list:
-    #tokenizer for page content
+def tokenize(content) -> tuple:
+    """
+    Tokenize page content in a single pass and return (tokens, word_count).
+    tokens are the words considered for the top 50 words (no stop words, single chars or numbers),
+    word_count is the number of all words on the page, stop words included.
+    content can be a string or an iterable of strings, so a huge page can be read in chunks;
+    a word split across two chunks is counted once.
+    """
+    if isinstance(content, str):
+        content = (content,)
     tokens = []
-    new_token = ""
-    for char in content:
-        text = str(char)
-        if not text:  # if 'text' is empty, every char in 'content' has been iterated over: check if 'new_token' is a valid word and add into 'tokens' if so
-            if not allow_stop_words:  # any words in the STOP_WORDS list won't be considered
-                if new_token and new_token not in STOP_WORDS and len(new_token) > 1 and not(new_token.isdigit()):  # if new_token is a valid word, then add it to the list of tokens found on this page
-                    tokens.append(new_token)
-                    break
-            else:
-                if new_token:
-                    tokens.append(new_token)
-                    break
-        if text.isalnum():  # if char is alphanumeric, add it to 'new_token' and continue checking for valid chars
-            new_token += text.lower()
-        else:  # else, for-loop has iterated over a full word: check if it's valid, and add to 'tokens' if so
-            if not allow_stop_words:  # any words in the STOP_WORDS list won't be considered
-                if new_token and new_token not in STOP_WORDS and len(new_token) > 1 and not(new_token.isdigit()):
-                    tokens.append(new_token)
-            else:
-                if new_token:
-                    tokens.append(new_token)
-            new_token = ""
-    return tokens
+    word_count = 0
+    carry = ""  # start of a word that may continue in the next chunk
+    for chunk in content:
+        text = carry + chunk.lower()
+        words = WORD_PATTERN.findall(text)
+        carry = words.pop() if words and text[-1].isalnum() else ""
+        word_count += len(words)
+        tokens.extend([word for word in words if len(word) > 1 and word not in STOP_WORDS and not word.isdigit()])
+    if carry:
+        word_count += 1
+        if len(carry) > 1 and carry not in STOP_WORDS and not carry.isdigit():
+            tokens.append(carry)
+    return tokens, word_count
 
 def update_freq(tokens) -> None:
-    #updates the global FREQ_DICT dictionary
-    global FREQ_DICT
-    for token in tokens:  # increase token's frequency of being found while crawling by 1; if it doesn't exist, then add the word to the dictionary
-        try:
-            FREQ_DICT[token] += 1
-        except KeyError:
-            FREQ_DICT[token] = 1
-
-    with open('top50.txt', 'w') as f:  # as words are added to the dictionary, re-evaluate the 50 words encountered most frequently while crawling; save this info to a separate txt file in case of server crashes/bugs crashing the program
-        f.write("Top 50 Words:\n")
-        items = sorted(FREQ_DICT.items(), key = lambda token: token[1], reverse = True)[0:50]
-        for word in items:
-            try:
-                f.write(f"{word[0]}: {word[1]}\n")
-            except IndexError:
-                break
-
-def update_longest_page(content, page) -> None:
-    #Update the longest page found using global variables
-    global LONGEST_PAGE
-
-    curr_len = len(tokenizer(content, allow_stop_words=True))
-
-    if not LONGEST_PAGE:
-        LONGEST_PAGE = (page, curr_len)
-    elif curr_len > LONGEST_PAGE[1]:
-        LONGEST_PAGE = (page, curr_len)
-
-    with open('longest.txt', 'w') as f:  # re-evaluate the longest page encountered by the crawler as new pages are iterated over; save this info to a separate txt file in case of server crashes/bugs crashing the program
-        f.write(f"Longest page: {LONGEST_PAGE[0]}\nLength: {LONGEST_PAGE[1]}")
+    #updates the word frequencies of the report statistics, from the tokens of a page or a Counter of them
+    STATS.submit("add_words", tokens)
 
-#SIMHASHING DONE BELOW--------------------------------------------------------------------------------------------------------------------------------
-'''
-Member Variables:
-tokens
-
-'''
-
-def string_to_binary_hash(string):
-    hash_value = hashlib.sha256(string.encode()).hexdigest()
-    binary_hash = bin(int(hash_value, 16))[2:] # remove header of binary string
-    binary_hash = binary_hash[:10].zfill(10)
-    return binary_hash
-
-def list_to_binary_hash(string_list):
-    binary_hashes = []
-    for string in string_list:
-        binary_hash = string_to_binary_hash(string)
-        binary_hashes.append(binary_hash)
-    return binary_hashes
-
-def computeWordFrequencies(tokens) -> dict :  # return frequencies of file's tokens
-    instances = {} # dict of frequencies of words in the given text file
-    for token in tokens:
-        if token not in instances:
-            instances[token] = 0
-        instances[token] += 1
-    return instances
-
-def count_digit(token_freq):
-    data_for_fingerprint = []
-    for x in range(10):
-        bit_sum = 0
-        for key, value in token_freq.items():
-            if get_digit(int(key), x) > 0:
-                bit_sum += value
-            else:
-                bit_sum -= value
-        data_for_fingerprint.append(bit_sum)
-    return data_for_fingerprint
-
-# The // performs integer division by a power of ten to move the digit to the ones position, 
-# then the % gets the remainder after division by 10.
-# Note that the numbering in this scheme uses zero-indexing and starts from the right side of the number.
-def get_digit(number, n):
-    return number // 10**n % 10
-
-def generate_fingerprint(list):
-    fingerprint = []
-    for value in list:
-        if value > 0:
-            fingerprint.append(1)
-        else:
-            fingerprint.append(0)
-    return fingerprint
-
-#if its similar return true, else return false
-def compare_fingerprint(previous_hash, new_fingerprint):
-    #see how many bits are the same from the first fingerprint to the second
-    similarity_score = 0
-    threshold = 0.85
-    for x in range(10):
-        if previous_hash[x] == new_fingerprint[x]:
-            similarity_score += 1
-    if similarity_score/10 > threshold:
-        return True
-    return False
 
+def update_longest_page(curr_len, page) -> None:
+    #Update the longest page found in the report statistics
+    STATS.submit("update_longest", page, curr_len)
 
-#handles calendar webpages/ blogs/ events
-#values of the binary are reversed, that means the data originally is 1-2-3-4-5, but our fingerprint is stored as 5-4-3-2-1
-#if you want to access these values, start from the beginning of the fingerprint (but know that that's the last hash)
-def sim_hash(previous_hash, tokens):
-    global PREVIOUS_HASH
+#SIMHASHING DONE BELOW--------------------------------------------------------------------------------------------------------------------------------
 
-    hash_tokens = list_to_binary_hash(tokens)
-    token_freq = computeWordFrequencies(hash_tokens)
-    #print(token_freq)
-    fingerprint = generate_fingerprint(count_digit(token_freq))
-    if PREVIOUS_HASH:
-        if compare_fingerprint(previous_hash, fingerprint) == True:
-            return True
-    PREVIOUS_HASH = fingerprint
-    return False
+#handles calendar webpages/ blogs/ events/ wiki revisions
+#pages are compared against every page crawled so far, not only the previous one
+def sim_hash(fingerprint) -> bool:
+    """
+    Take the fingerprint of a page, made by simhash() from its tokens weighted by frequency, and
+    return True if a near duplicate was crawled before. Otherwise the fingerprint is stored for later pages.
+    """
+    return SIMHASH_INDEX.add(fingerprint)
 
 
 #IS_VALID GLOBAL VARIABLES AND HELPERS BELOW ----------------------------------------------------------------------------------------------------------
-def is_valid(url, subdomain_count = SD_COUNT, unique_pages = U_PAGES) -> bool:
+RULES_VERSION = 2  # bump whenever a rule below changes in code rather than in these constants, so saved urls get checked again
+VALID_DOMAINS = {"ics.uci.edu", "cs.uci.edu", "informatics.uci.edu", "stats.uci.edu"}  # these domains and their subdomains
+INVALID_PATHS = {"pdf", "css", "js", "png", "jpeg", "jpg", "uploads", "upload", "calendar", "login"}  # urls with a path segment starting with any of these aren't valid
+INVALID_EXTENSIONS = {
+    "css", "js", "bmp", "gif", "jpeg", "jpg", "ico",
+    "png", "tif", "tiff", "mid", "mp2", "mp3", "mp4",
+    "wav", "avi", "mov", "mpeg", "ram", "m4v", "mkv", "ogg", "ogv", "pdf",
+    "ps", "eps", "tex", "ppt", "pptx", "ppsx", "doc", "docx", "xls", "xlsx", "names",
+    "data", "dat", "exe", "bz2", "tar", "msi", "bin", "7z", "psd", "dmg", "iso",
+    "epub", "dll", "cnf", "tgz", "sha1",
+    "thmx", "mso", "arff", "rtf", "jar", "csv",
+    "rm", "smil", "wmv", "swf", "wma", "zip", "rar", "gz", "odc"}
+URL_FILTER = URLFilter(VALID_DOMAINS, INVALID_PATHS, INVALID_EXTENSIONS, version=RULES_VERSION)  # pure checks of the rules above, shared with the frontier
+
+
+def rules_fingerprint() -> str:
     """
-    Determines if URL is valid for scraping and returns boolean.
-    Has side effect of answering questions about the URL for report deliverable. Answers
-    will be added to global variables.
+    Return a digest of the rules deciding which urls may be crawled. It changes whenever the rules do.
     """
+    return URL_FILTER.fingerprint()
 
-    try:
-        parsed = urlparse(url)  # Breaks the url into parts.
-
-        if (parsed.scheme not in {"http", "https"}          or
-            check_valid_domain(parsed) == False             or
-            check_uniqueness(parsed, unique_pages) == False ):
-            return False  # if scheme or domain of the url isn't valid, or it's not a unique page, then it's not valid
 
-        add_to_subdomain_count(parsed, subdomain_count)
-
-        if re.match(r".*/(pdf|css|js|png|jpe&g|uploads|upload|calendar|login)/*", parsed.path.lower()):
-            return False  # if the url leads to any of these tyeps of pages, it's not valid
+def is_valid(url, subdomain_count = None, unique_pages = U_PAGES) -> bool:
+    """
+    Determines if URL is valid for scraping and returns boolean.
+    Has side effect of answering questions about the URL for report deliverable. Answers
+    will be added to the report statistics, or to subdomain_count if given.
+    """
+    return URL_FILTER.is_valid(url) and record_unique(url, subdomain_count, unique_pages)
 
-        return not re.match(
-            r".*\.(css|js|bmp|gif|jpe?g|ico"
-            + r"|png|tiff?|mid|mp2|mp3|mp4"
-            + r"|wav|avi|mov|mpeg|ram|m4v|mkv|ogg|ogv|pdf|/pdf/"
-            + r"|ps|eps|tex|ppt|pptx|ppsx|doc|docx|xls|xlsx|names"
-            + r"|data|dat|exe|bz2|tar|msi|bin|7z|psd|dmg|iso"
-            + r"|epub|dll|cnf|tgz|sha1"
-            + r"|thmx|mso|arff|rtf|jar|csv"
-            + r"|rm|smil|wmv|swf|wma|zip|rar|gz|odc)$", parsed.path.lower())
 
-    except TypeError:
-        print("TypeError for ", parsed)
-        raise
+def record_unique(url, subdomain_count = None, unique_pages = U_PAGES) -> bool:
+    """
+    Count a url that passed URL_FILTER for the report deliverable, and return True if it's a unique page.
+    """
+    parsed = urlparse(url)  # Breaks the url into parts.
+    if not check_uniqueness(parsed, unique_pages):
+        return False  # if it's not a unique page, then it's not valid
+    add_to_subdomain_count(parsed, subdomain_count)
+    return True
 
 
 # Helper methods for is_valid()
@@ -271,20 +201,13 @@ def check_valid_domain(parsed_url) -> bool:
     """
     If not a UCI domain, return False.
     """
-    valid_domains = {".ics.uci.edu", ".cs.uci.edu",
-                   ".informatics.uci.edu", ".stats.uci.edu"}
-
-    for domain in valid_domains:
-        if not parsed_url.hostname:  # domain isn't valid if hostname == None
-            return False
-        if parsed_url.hostname.find(domain) > -1:  # domain is valid if hostname contains any string from the valid_domains set
-            return True
-    return False
+    return URL_FILTER.allows_host(parsed_url.hostname)  # valid if the hostname is in VALID_DOMAINS or a subdomain of one
 
 
-def add_to_subdomain_count(parsed_url, subdomain_count) -> bool:
+def add_to_subdomain_count(parsed_url, subdomain_count=None) -> bool:
     """
-    Increment subdomain count for parsed url and return if subdomain
+    Increment subdomain count for parsed url and return if subdomain.
+    Counts go to subdomain_count if given, otherwise to the report statistics.
     """
     valid_subdomains = {".ics.uci.edu"}
     for subdomain in valid_subdomains:
@@ -292,15 +215,14 @@ def add_to_subdomain_count(parsed_url, subdomain_count) -> bool:
             return False
         if subdomain in parsed_url.hostname:  # if hostname contains a valid subdomain, normalize the url and add it to / increment it in subdomain_count
             hostname = hostname_normalization(parsed_url)
-            if hostname in subdomain_count:
+            if hostname == "ics.uci.edu":  # www.ics.uci.edu normalizes to the domain itself, which isn't counted
+                return True
+            if subdomain_count is None:
+                STATS.submit("add_subdomain", hostname)
+            elif hostname in subdomain_count:
                 subdomain_count[hostname] += 1
             else:
                 subdomain_count[hostname] = 1
-            subdomain_count.pop("ics.uci.edu", None) #scuffed ass solution but its okay
-            with open('subdomains.txt', 'w') as f:  # note the subdomains crawled over and how often they were encountered; save this info to a separate txt file in case of server crashes/bugs crashing the program
-                f.write(f"# of subdomains: {len(subdomain_count)}\n")
-                for sd, freq in subdomain_count.items():
-                    f.write(f"\t{sd}: {freq}\n")
             return True
     return False
 
@@ -326,24 +248,25 @@ def query_normalization(url):
     return sorted(parse_qs(url.query))
 
 
+def canonical_url(parsed_url):
+    """
+    Return the key two urls share if and only if check_uniqueness considers them the same page.
+    """
+    return (parsed_url.scheme,
+            hostname_normalization(parsed_url),
+            path_normalization(parsed_url),
+            parsed_url.params,
+            tuple(query_normalization(parsed_url)))
+
+
 def check_uniqueness(parsed_url, unique_pages):
     """
     Disregard url fragment and return True if unique.
     """
-    unique = True
-    for page in unique_pages:
-        if (parsed_url.scheme == page.scheme                                   and
-            hostname_normalization(parsed_url) == hostname_normalization(page) and
-            path_normalization(parsed_url) == path_normalization(page)         and
-            parsed_url.params == page.params                                   and
-            query_normalization(parsed_url) == query_normalization(page)          ):
-                unique = False
+    unique = unique_pages.add(parsed_url)
 
     if unique:
-        unique_pages.add(parsed_url)
-        with open('unique.txt', 'w') as f:
-            f.write(f'Amount of unique pages: {len(unique_pages)}')
+        STATS.submit("set_unique", len(unique_pages))
 
     return unique
 
-
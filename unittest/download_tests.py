@@ -0,0 +1,67 @@
+import asyncio
+import pickle
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from types import SimpleNamespace
+from urllib.parse import urlparse, parse_qs
+
+import cbor
+
+from utils.aiodownload import ConnectionPool, download_async
+
+
+class StubCacheHandler(BaseHTTPRequestHandler):
+    """ Answers like the cache server: a CBOR dict with a pickled response. """
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        url = parse_qs(urlparse(self.path).query)["q"][0]
+        raw = SimpleNamespace(url=url, content=f"<html>{url}</html>".encode())
+        body = cbor.dumps({"url": url, "status": 200, "response": pickle.dumps(raw)})
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class AsyncDownloadTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubCacheHandler)
+        self.server.connections = 0
+        Thread(target=self.server.serve_forever, daemon=True).start()
+        self.config = SimpleNamespace(
+            user_agent="IR US24,test", cache_server=self.server.server_address)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_pooled_downloads(self):
+        urls = [f"https://www.ics.uci.edu/page{i}" for i in range(40)]
+
+        async def fetch_all():
+            pool = ConnectionPool(*self.server.server_address, size=4)
+            responses = await asyncio.gather(
+                *(download_async(url, self.config, pool) for url in urls))
+            await pool.close()
+            return pool, responses
+
+        pool, responses = asyncio.run(fetch_all())
+        self.assertEqual([resp.url for resp in responses], urls)
+        self.assertEqual(responses[3].raw_response.content, f"<html>{urls[3]}</html>".encode())
+        self.assertTrue(all(resp.status == 200 for resp in responses))
+        # Connections are kept alive and reused, never more than the pool size.
+        self.assertLessEqual(pool.opened, 4)
+        self.assertLessEqual(self.server.connections, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
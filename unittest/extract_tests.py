@@ -0,0 +1,43 @@
+import unittest
+from scraper import tokenize
+from utils.extract import stream_extract, soup_extract
+
+FIXTURES = [
+    b'<html><head><title>Faculty &amp; Staff</title><style>p {color: red}</style>'
+    b'<script>document.write("<a href=/hidden>")</script></head>'
+    b'<body><!-- nav --><p>Welcome to the Donald Bren School&nbsp;of ICS<br>Irvine</p>'
+    b'<a href="https://www.ics.uci.edu/people">People <b>and</b> staff</a><a>no href</a><a href>empty</a>'
+    b'<template><a href="/template">tp</a></template><textarea>draft</textarea><![CDATA[raw]]>'
+    b'<ruby>kan<rt>ji</rt></ruby> &#65;&#x42; &copy; &ampx</body></html>',
+    '<meta charset="iso-8859-1"><p>caf\xe9 na\xefve</p><a href="/caf\xe9">\xe9t\xe9</a>'.encode('latin-1'),
+    b'<div><p>unclosed <a href="/one">one <a href="/two">two</div> tail <a href="/one">again</a>'
+    b'<style/>visible <a href="/self"/>after <base href="https://www.ics.uci.edu/">',
+]
+
+
+class ExtractTestCase(unittest.TestCase):
+    def test_same_as_soup(self):
+        for fixture in FIXTURES:
+            stream, soup = stream_extract(fixture), soup_extract(fixture)
+            self.assertEqual(tokenize(stream.text), tokenize(soup.text))
+            self.assertEqual([link.href for link in stream.links], [link.href for link in soup.links])
+            self.assertEqual(stream.base, soup.base)
+
+    def test_extract(self):
+        page = stream_extract(FIXTURES[0])
+        text = "".join(page.text)
+        self.assertIn("Donald Bren School\xa0of ICS", text)
+        self.assertNotIn("color", text)
+        self.assertNotIn("document", text)
+        self.assertEqual(page.links[0], ("https://www.ics.uci.edu/people", "People and staff"))
+        self.assertEqual([link.href for link in page.links[1:]], [None, "", "/template"])
+        self.assertEqual(stream_extract(FIXTURES[2]).base, "https://www.ics.uci.edu/")
+
+    def test_limit(self):
+        page = b"<p>" + b"word " * 10000 + b'</p><a href="/late">late</a>'
+        self.assertEqual(tokenize(stream_extract(page, limit=503).text), (["word"] * 100, 100))
+        self.assertEqual(stream_extract(page, limit=503).links, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import time
+import unittest
+from threading import Thread
+from types import SimpleNamespace
+
+from crawler.frontier import Frontier
+
+
+def make_config(directory, seeds, delay=0.0):
+    return SimpleNamespace(
+        save_file=os.path.join(directory, "frontier.db"),
+        save_batch=500, save_interval=5.0,
+        seed_urls=seeds, time_delay=delay, threads_count=1)
+
+
+class FrontierTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hosts_alternate(self):
+        config = make_config(self.tmp.name, ["https://www.ics.uci.edu/a", "https://www.cs.uci.edu/a"])
+        frontier = Frontier(config, True)
+        frontier.add_url("https://www.ics.uci.edu/b")
+        first = frontier.get_tbd_url()
+        second = frontier.get_tbd_url()
+        # The host of the first url is busy until it is completed.
+        self.assertNotEqual(first.split("/")[2], second.split("/")[2])
+        frontier.mark_url_complete(first)
+        frontier.mark_url_complete(second)
+        self.assertEqual(frontier.get_tbd_url(), "https://www.ics.uci.edu/b")
+
+    def test_per_host_politeness(self):
+        config = make_config(self.tmp.name, ["https://www.ics.uci.edu/a", "https://www.ics.uci.edu/b"], delay=0.2)
+        frontier = Frontier(config, True)
+        url = frontier.get_tbd_url()
+        frontier.mark_url_complete(url)
+        start = time.time()
+        frontier.get_tbd_url()
+        self.assertGreaterEqual(time.time() - start, 0.15)
+
+    def test_waits_for_in_progress_urls(self):
+        config = make_config(self.tmp.name, ["https://www.ics.uci.edu/a"])
+        frontier = Frontier(config, True)
+        url = frontier.get_tbd_url()
+        result = []
+        waiter = Thread(target=lambda: result.append(frontier.get_tbd_url()))
+        waiter.start()
+        time.sleep(0.05)
+        # The frontier is empty, but the page being processed may add urls.
+        self.assertTrue(waiter.is_alive())
+        frontier.add_url("https://www.cs.uci.edu/found")
+        frontier.mark_url_complete(url)
+        waiter.join(1)
+        self.assertEqual(result, ["https://www.cs.uci.edu/found"])
+        frontier.mark_url_complete(result[0])
+        self.assertIsNone(frontier.get_tbd_url())
+
+    def test_resume_after_crash(self):
+        seeds = ["https://www.ics.uci.edu/crash", "https://www.cs.uci.edu/crash"]
+        config = make_config(self.tmp.name, seeds)
+        config.save_batch = 2
+        frontier = Frontier(config, True)  # the two seeds fill one batch
+        done = frontier.get_tbd_url()
+        frontier.mark_url_complete(done)
+        # Crash before the completion is committed: both urls are redone.
+        resumed = Frontier(config, False)
+        self.assertEqual(len(resumed.host_queues), 2)
+        resumed.add_url(done)  # already seen, not queued again
+        self.assertEqual(sum(map(len, resumed.host_queues.values())), 2)
+
+    def test_resume_checks_urls_only_when_rules_change(self):
+        config = make_config(self.tmp.name, ["https://www.ics.uci.edu/rules"])
+        frontier = Frontier(config, True)
+        # Saved while the rules still allowed it.
+        frontier.save["offsite"] = ("https://www.google.com/", False)
+        frontier.save.sync()
+        self.assertEqual(Frontier(config, False).queued, 2)
+        self.assertEqual(Frontier(config, False).queued, 2)
+
+        frontier.save.set_meta("rules", "older rules")
+        resumed = Frontier(config, False)
+        self.assertEqual(resumed.get_tbd_url(), "https://www.ics.uci.edu/rules")
+        self.assertEqual(resumed.queued, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import scraper
+from crawler.frontier import Frontier
+from crawler.pipeline import ParsePipeline
+from frontier_tests import make_config
+
+
+def make_page(url, links):
+    body = "<p>" + " ".join(f"word{i}" for i in range(30)) + "</p>"
+    body += "".join(f'<a href="{link}">{link}</a>' for link in links)
+    return SimpleNamespace(status=200, raw_response=SimpleNamespace(url=url, content=body.encode()))
+
+
+class ParsePipelineTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    # Report statistics and the SimHash index are left out; they are tested with the scraper.
+    @mock.patch("scraper.make_db")
+    @mock.patch("scraper.needs_parsing", lambda resp: True)
+    @mock.patch("scraper.apply_page", lambda result: result.links if result else [])
+    def test_pages_are_parsed_and_merged(self, make_db):
+        seeds = [f"https://www.ics.uci.edu/{i}" for i in range(8)]
+        frontier = Frontier(make_config(self.tmp.name, seeds), True)
+        pipeline = ParsePipeline(frontier, 2, max_pending=3)
+        for _ in seeds:
+            url = frontier.get_tbd_url()
+            pipeline.submit(url, make_page(url, [url + "/next", "https://www.google.com/"]))
+        pipeline.close()
+        # Every page was completed and only its valid link was added.
+        next_urls = sorted(frontier.get_tbd_url() for _ in seeds)
+        self.assertEqual(next_urls, sorted(url + "/next" for url in seeds))
+        self.assertEqual(frontier.in_progress, len(seeds))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,16 @@
 import unittest
 import re
+import os
+import random
+import tempfile
+from collections import Counter
 from urllib.parse import urlparse
-from scraper import check_valid_domain, add_to_subdomain_count, check_uniqueness
+from scraper import check_valid_domain, add_to_subdomain_count, check_uniqueness, canonical_url, tokenize, URL_FILTER
+from utils.urlstore import SeenURLs
+from utils.simhash import SimHashIndex, simhash, hamming_distance
+from utils.digest import ContentDigests
+from utils.wordcount import TopWords
+from utils.stats import CrawlStats, StatsWriter
 
 class ScraperHelperTestCase(unittest.TestCase):
     def test_domain_validity(self):
@@ -19,13 +28,14 @@ class ScraperHelperTestCase(unittest.TestCase):
         parsed_with_fragment = urlparse('https://ics.uci.edu/~dillenco/ics6d/#coursedescription')
         nonnormal = urlparse('https://www.ics.uci.edu/////////////////~dillenco/ics6d//////////////////////////#coursestaff')
         newsite = urlparse('https://ics.uci.edu/~dillenco/ics6d/testing/')
-        unique_pgs = set()
+        unique_pgs = SeenURLs(canonical_url)
         unique_pgs.add(base)
         self.assertFalse(check_uniqueness(parsed_with_fragment, unique_pgs))
         self.assertFalse(check_uniqueness(nonnormal, unique_pgs))
-        self.assertEqual(unique_pgs, {base})
+        self.assertEqual(len(unique_pgs), 1)
         self.assertTrue(check_uniqueness(newsite, unique_pgs))
-        self.assertEqual(unique_pgs, {base, newsite})
+        self.assertEqual(len(unique_pgs), 2)
+        self.assertIn(newsite, unique_pgs)
 
     def test_subdomain_checker(self):
         sd_count = {}
@@ -42,6 +52,129 @@ class ScraperHelperTestCase(unittest.TestCase):
     def test_pdf_not_valid(self):
         pdf = urlparse('https://www.informatics.uci.edu/files/pdf/InformaticsBrochure-March2018')
         self.assertTrue(re.match(r".*/(pdf|css|js|png|jpe&g)/*", pdf.path.lower()))
+        self.assertFalse(URL_FILTER.is_valid(pdf.geturl()))
+
+    def test_url_filter(self):
+        urls = ['https://www.ics.uci.edu/~dillenco/ics6d',
+                'http://archive.ics.uci.edu/dataset/53/iris',
+                'https://ics.uci.edu/',
+                'ftp://www.ics.uci.edu/',
+                'https://www.google.com/?q=ics.uci.edu',
+                'https://physics.uci.edu/',
+                'https://www.ics.uci.edu/wp-content/uploads/poster',
+                'https://www.ics.uci.edu/courses/slides.PPTX',
+                'https://www.ics.uci.edu/pub/notes.ps',
+                'https://www.ics.uci.edu/pub/setup.py',
+                None]
+        expected = [True, True, True, False, False, False, False, False, False, True, False]
+        self.assertEqual(URL_FILTER.is_valid_many(urls), expected)
+        self.assertEqual([URL_FILTER.is_valid(url) for url in urls], expected)
+
+    def test_tokenize(self):
+        text = "The Informatics building, room 6011: open to all Students!"
+        tokens, word_count = tokenize(text)
+        self.assertEqual(tokens, ["informatics", "building", "room", "open", "students"])
+        self.assertEqual(word_count, 9)
+        # Words split across chunks are put back together.
+        self.assertEqual(tokenize(["The Infor", "matics build", "ing, room 60", "11: open to all Students!"]),
+                         (tokens, word_count))
+
+
+class SimHashTestCase(unittest.TestCase):
+    def page(self, month, day):
+        # A calendar page: the same words every day, only the date changes.
+        words = "seminar series calendar events department computer science talk room".split() * 20
+        return Counter(words + [month, str(day), f"{month}{day}"])
+
+    def test_near_duplicates(self):
+        first, second = simhash(self.page("june", 1)), simhash(self.page("june", 2))
+        other = simhash(Counter("graduate admissions deadline application fee waiver".split()))
+        self.assertLessEqual(hamming_distance(first, second), 3)
+        self.assertGreater(hamming_distance(first, other), 3)
+
+    def test_index_persists(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "hashes.db")
+            index = SimHashIndex(path, batch_size=1)
+            self.assertFalse(index.add(simhash(self.page("june", 1))))
+            self.assertFalse(index.add(simhash(Counter("graduate admissions deadline".split()))))
+            # Not the previous page, but still found.
+            self.assertTrue(index.add(simhash(self.page("june", 2))))
+            index.db.close()
+            reopened = SimHashIndex(path)
+            self.assertEqual(len(reopened), 2)
+            self.assertTrue(reopened.add(simhash(self.page("july", 4))))
+            reopened.db.close()
+
+
+class ContentDigestsTestCase(unittest.TestCase):
+    def test_duplicate_bodies(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            digests = ContentDigests(os.path.join(tmp, "hashes.db"), max_size=2)
+            self.assertFalse(digests.add(b"<html><body>Seminar  June 1</body></html>"))
+            self.assertTrue(digests.add(b"<html><body>Seminar\n\tJune 1</body></html>\n"))
+            self.assertFalse(digests.add(b"<html><body>Seminar June 2</body></html>"))
+            self.assertFalse(digests.add(b"<html><body>Seminar June 3</body></html>"))
+            self.assertEqual((digests.hits, digests.misses, len(digests)), (1, 3, 2))
+            digests.flush()
+            digests.db.close()
+            # Only the 2 most recent bodies are kept, also on disk.
+            reopened = ContentDigests(os.path.join(tmp, "hashes.db"), max_size=2)
+            self.assertTrue(reopened.add(b"<html><body>Seminar June 3</body></html>"))
+            self.assertFalse(reopened.add(b"<html><body>Seminar June 1</body></html>"))
+            reopened.db.close()
+
+
+class TopWordsTestCase(unittest.TestCase):
+    def pages(self):
+        rng = random.Random(0)
+        vocabulary = [f"word{i}" for i in range(2000)]
+        # Zipf-like: a few words are much more frequent than the rest.
+        weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+        return [rng.choices(vocabulary, weights, k=300) for _ in range(200)]
+
+    def test_exact_top_words(self):
+        words, everything = TopWords(50), Counter()
+        for page in self.pages():
+            words.update(page)
+            everything.update(page)
+        top = words.most_common(50)
+        # Words tied at the 50th place may differ, but not the counts.
+        self.assertEqual([freq for _, freq in top], [freq for _, freq in everything.most_common(50)])
+        self.assertTrue(all(everything[word] == freq for word, freq in top))
+
+    def test_sketch_top_words(self):
+        words, everything = TopWords(50, sketch_width=4096), Counter()
+        for page in self.pages():
+            words.update(page)
+            everything.update(page)
+        top = [word for word, _ in words.most_common(10)]
+        self.assertEqual(top, [word for word, _ in everything.most_common(10)])
+
+
+class StatsWriterTestCase(unittest.TestCase):
+    def test_report_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = StatsWriter(CrawlStats(), interval=60, directory=tmp)
+            writer.start()
+            writer.submit("add_words", ["research", "software", "research"])
+            writer.submit("update_longest", "https://www.ics.uci.edu/long", 120)
+            writer.submit("update_longest", "https://www.ics.uci.edu/short", 12)
+            writer.submit("add_subdomain", "vision.ics.uci.edu")
+            writer.submit("set_unique", 3)
+            writer.submit("log_similarity", "https://www.ics.uci.edu/long", False)
+            self.assertEqual(os.listdir(tmp), [])  # nothing is written until the interval or close
+            writer.close()
+            with open(os.path.join(tmp, "top50.txt")) as f:
+                self.assertEqual(f.read(), "Top 50 Words:\nresearch: 2\nsoftware: 1\n")
+            with open(os.path.join(tmp, "longest.txt")) as f:
+                self.assertEqual(f.read(), "Longest page: https://www.ics.uci.edu/long\nLength: 120")
+            with open(os.path.join(tmp, "subdomains.txt")) as f:
+                self.assertEqual(f.read(), "# of subdomains: 1\n\tvision.ics.uci.edu: 1\n")
+            with open(os.path.join(tmp, "unique.txt")) as f:
+                self.assertEqual(f.read(), "Amount of unique pages: 3")
+            with open(os.path.join(tmp, "SimHashLog.txt")) as f:
+                self.assertEqual(f.read(), "https://www.ics.uci.edu/long : Page Not Similar\n")
 
 
 if __name__ == '__main__':
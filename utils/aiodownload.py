@@ -0,0 +1,134 @@
+import asyncio
+import cbor
+
+from collections import deque
+from urllib.parse import urlencode
+
+from utils.response import Response
+
+
+class ConnectionPool(object):
+    """
+    Bounded pool of keep-alive HTTP/1.1 connections to the cache server.
+    At most size requests are in flight at once; finished connections are
+    kept open and reused by the next request instead of reconnecting.
+    Must be created and used inside one running event loop.
+    """
+
+    def __init__(self, host, port, size):
+        self.host = host
+        self.port = port
+        self.slots = asyncio.Semaphore(size)
+        self.idle = deque()  # format: (reader, writer) of open connections
+        self.opened = 0  # number of TCP connections made, for monitoring reuse
+
+    async def get(self, path, params):
+        """
+        GET path with params and return (status code, body bytes).
+        A request that fails on a reused connection is retried once on a
+        fresh one, since the server may have closed it while it was idle.
+        """
+        request = (
+            f"GET {path}?{urlencode(params)} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            f"Connection: keep-alive\r\n\r\n").encode("latin-1")
+        async with self.slots:
+            reused = bool(self.idle)
+            reader, writer = await self._connection()
+            try:
+                status, body, keep_alive = await _exchange(reader, writer, request)
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                writer.close()
+                if not reused:
+                    raise
+                reader, writer = await self._connection(fresh=True)
+                try:
+                    status, body, keep_alive = await _exchange(reader, writer, request)
+                except BaseException:
+                    writer.close()
+                    raise
+            except BaseException:
+                writer.close()
+                raise
+            if keep_alive:
+                self.idle.append((reader, writer))
+            else:
+                writer.close()
+            return status, body
+
+    async def close(self):
+        while self.idle:
+            _, writer = self.idle.pop()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def _connection(self, fresh=False):
+        while self.idle and not fresh:
+            reader, writer = self.idle.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return reader, writer
+            writer.close()
+        self.opened += 1
+        return await asyncio.open_connection(self.host, self.port)
+
+
+async def _exchange(reader, writer, request):
+    """
+    Send one request and read its response. Returns (status code, body,
+    whether the connection can be reused).
+    """
+    writer.write(request)
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise asyncio.IncompleteReadError(b"", None)
+    version, status = status_line.split(None, 2)[:2]
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    keep_alive = (
+        version == b"HTTP/1.1" and
+        headers.get("connection", "").lower() != "close")
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                await reader.readline()  # blank line after the last chunk
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)  # CRLF closing the chunk
+        body = b"".join(chunks)
+    elif "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    else:
+        body = await reader.read()
+        keep_alive = False
+    return int(status), body, keep_alive
+
+
+async def download_async(url, config, pool, logger=None):
+    """
+    Coroutine counterpart of utils.download.download that fetches url from
+    the cache server through pool.
+    """
+    status, content = await pool.get(
+        "/", [("q", f"{url}"), ("u", f"{config.user_agent}")])
+    try:
+        if status < 400 and content:
+            return Response(cbor.loads(content))
+    except (EOFError, ValueError) as e:
+        pass
+    if logger:
+        logger.error(f"Spacetime Response error <{status}> with url {url}.")
+    return Response({
+        "error": f"Spacetime Response error <{status}> with url {url}.",
+        "status": status,
+        "url": url})
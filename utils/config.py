@@ -9,6 +9,10 @@ class Config(object):
         assert re.match(r"^[a-zA-Z0-9_ ,]+$", self.user_agent), "User agent should not have any special characters outside '_', ',' and 'space'"
         self.threads_count = int(config["LOCAL PROPERTIES"]["THREADCOUNT"])
         self.save_file = config["LOCAL PROPERTIES"]["SAVE"]
+        self.save_batch = int(config["LOCAL PROPERTIES"].get("SAVEBATCH", "500"))
+        self.save_interval = float(config["LOCAL PROPERTIES"].get("SAVEINTERVAL", "5"))
+        self.async_requests = int(config["LOCAL PROPERTIES"].get("ASYNCREQUESTS", "0"))
+        self.parse_processes = int(config["LOCAL PROPERTIES"].get("PARSEPROCESSES", "0"))
 
         self.host = config["CONNECTION"]["HOST"]
         self.port = int(config["CONNECTION"]["PORT"])
@@ -0,0 +1,81 @@
+import sqlite3
+import time
+
+from collections import OrderedDict
+from hashlib import blake2b
+from threading import Lock
+
+
+def content_digest(content) -> bytes:
+    """
+    Return a 16-byte digest of a page body that ignores differences in whitespace.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8", "surrogatepass")
+    return blake2b(b" ".join(content.split()), digest_size=16).digest()
+
+
+class ContentDigests(object):
+    """
+    Digests of the most recent max_size page bodies, kept in memory in LRU
+    order and saved to the digests table of a SQLite database, so exact
+    duplicates are recognized before any parsing, also after a restart.
+    hits and misses count the bodies found and not found.
+    """
+
+    def __init__(self, path, max_size=200000, batch_size=100, interval=5.0):
+        self.max_size = max_size
+        self.digests = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+        self.batch_size = batch_size
+        self.interval = interval
+        self.unsaved = list()
+        self.last_commit = time.time()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS digests(digest BLOB PRIMARY KEY)")
+        for (digest,) in self.db.execute(
+                "SELECT digest FROM digests ORDER BY rowid DESC LIMIT ?", (max_size,)):
+            self.digests[digest] = None
+            self.digests.move_to_end(digest, last=False)
+
+    def __len__(self):
+        return len(self.digests)
+
+    def add(self, content) -> bool:
+        """
+        Remember the digest of content and return True if it was seen before.
+        """
+        digest = content_digest(content)
+        with self.lock:
+            if digest in self.digests:
+                self.digests.move_to_end(digest)
+                self.hits += 1
+                return True
+            self.misses += 1
+            self.digests[digest] = None
+            if len(self.digests) > self.max_size:
+                self.digests.popitem(last=False)
+            self.unsaved.append((digest,))
+            if (len(self.unsaved) >= self.batch_size or
+                    time.time() - self.last_commit >= self.interval):
+                self._commit()
+            return False
+
+    def flush(self):
+        with self.lock:
+            self._commit()
+
+    def _commit(self):
+        if self.unsaved:
+            with self.db:
+                self.db.executemany(
+                    "INSERT OR IGNORE INTO digests(digest) VALUES (?)", self.unsaved)
+                # Keep the table as bounded as the cache.
+                self.db.execute(
+                    "DELETE FROM digests WHERE rowid <= "
+                    "(SELECT MAX(rowid) FROM digests) - ?", (self.max_size,))
+            self.unsaved.clear()
+        self.last_commit = time.time()
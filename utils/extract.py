@@ -0,0 +1,133 @@
+from collections import namedtuple
+from html import unescape
+from html.entities import html5
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup as BS
+from bs4.dammit import UnicodeDammit
+
+Link = namedtuple("Link", ["href", "text"])  # href is None for an <a> without one
+Page = namedtuple("Page", ["text", "links", "base"])  # text: list of strings to concatenate, base: <base href> or None
+
+# Elements whose text isn't part of the visible text, as in BeautifulSoup.get_text().
+HIDDEN_ELEMENTS = frozenset(["script", "style", "template", "rt", "rp"])
+# Elements without an end tag.
+VOID_ELEMENTS = frozenset([
+    "area", "base", "basefont", "bgsound", "br", "col", "command", "embed", "frame",
+    "hr", "image", "img", "input", "isindex", "keygen", "link", "menuitem", "meta",
+    "nextid", "param", "source", "spacer", "track", "wbr"])
+CHUNK_SIZE = 64 * 1024  # characters of markup fed to the parser at a time
+
+
+def decode(content) -> str:
+    """
+    Decode a page body the way BeautifulSoup does: byte order mark, then the
+    declared charset, then a guess.
+    """
+    if isinstance(content, str):
+        return content
+    return UnicodeDammit(content, is_html=True).unicode_markup or ""
+
+
+def stream_extract(content, limit=None) -> Page:
+    """
+    Extract the visible text, the links with their anchor text and the <base href>
+    of a page in one pass of an event-driven parser, without building a tree.
+    Only the first limit characters of markup are parsed, if given.
+    """
+    parser = _PageParser()
+    markup = decode(content)
+    end = len(markup) if limit is None else min(len(markup), limit)
+    for start in range(0, end, CHUNK_SIZE):
+        parser.feed(markup[start:min(start + CHUNK_SIZE, end)])
+    parser.close()
+    return Page(parser.text, [Link(href, "".join(text)) for href, text in parser.links], parser.base)
+
+
+def soup_extract(content, limit=None) -> Page:
+    """
+    Same as stream_extract, from a BeautifulSoup tree of the whole page.
+    """
+    if limit is not None:
+        content = decode(content)[:limit]
+    soup = BS(content, 'html.parser')
+    base = soup.find('base', href=True)
+    return Page([soup.get_text()],
+                [Link(a.get('href'), a.get_text()) for a in soup.find_all('a')],
+                base['href'] if base else None)
+
+
+EXTRACTORS = {"stream": stream_extract, "soup": soup_extract}
+
+
+class _PageParser(HTMLParser):
+    """
+    Keeps the stack of open elements the way BeautifulSoup's html.parser
+    tree builder does, so the same strings end up in the text, but only
+    collects strings and links.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.text = []
+        self.links = []  # format: [(href, [anchor text]), ...]
+        self.base = None
+        self.open = []  # names of the open elements, innermost last
+        self.hidden = 0  # number of open HIDDEN_ELEMENTS
+        self.anchors = []  # format: [(index in open, [anchor text]), ...] of the open <a> elements
+
+    def handle_starttag(self, tag, attrs):
+        anchor_text = self._start(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            if anchor_text is not None:
+                self.anchors.append((len(self.open), anchor_text))
+            self.open.append(tag)
+            self.hidden += tag in HIDDEN_ELEMENTS
+
+    def handle_startendtag(self, tag, attrs):
+        self._start(tag, attrs)
+
+    def handle_endtag(self, tag):
+        for i in range(len(self.open) - 1, -1, -1):
+            if self.open[i] == tag:
+                break
+        else:
+            return  # nothing to close, as after a stray end tag
+        for name in self.open[i:]:
+            self.hidden -= name in HIDDEN_ELEMENTS
+        del self.open[i:]
+        while self.anchors and self.anchors[-1][0] >= i:
+            self.anchors.pop()
+
+    def handle_data(self, data):
+        if not self.hidden:
+            self.text.append(data)
+            for _, anchor_text in self.anchors:
+                anchor_text.append(data)
+
+    def handle_charref(self, name):
+        self.handle_data(unescape(f"&#{name};"))
+
+    def handle_entityref(self, name):
+        self.handle_data(html5.get(f"{name};", f"&{name}"))
+
+    def unknown_decl(self, data):
+        if data.upper().startswith("CDATA["):
+            self.handle_data(data[len("CDATA["):])
+
+    def _start(self, tag, attrs):
+        """
+        Record a link or the base url, and return the list collecting the anchor text of a link.
+        """
+        if tag == "a" or (tag == "base" and self.base is None):
+            attrs = dict(attrs)  # the last of repeated attributes wins
+            href = attrs.get("href")
+            if href is None and "href" in attrs:
+                href = ""  # <a href> has an empty href
+            if tag == "base":
+                self.base = href
+                return None
+            anchor_text = []
+            self.links.append((href, anchor_text))
+            return anchor_text
+        return None
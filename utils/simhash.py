@@ -0,0 +1,113 @@
+import sqlite3
+import time
+
+from hashlib import blake2b
+from threading import Lock
+
+BITS = 64
+
+
+def simhash(features) -> int:
+    """
+    Return the 64-bit SimHash of weighted features, a dict of {"feature": weight, ...}.
+    Similar feature sets get fingerprints that differ in few bits.
+    """
+    # Sum the weights per byte value at each position of the feature hashes
+    # first, then per bit: 8 additions per feature instead of 64.
+    byte_weights = [[0] * 256 for _ in range(BITS // 8)]
+    total = 0
+    for feature, weight in features.items():
+        digest = blake2b(feature.encode(), digest_size=BITS // 8).digest()
+        for position, value in enumerate(digest):
+            byte_weights[position][value] += weight
+        total += weight
+    fingerprint = 0
+    for position, weights in enumerate(byte_weights):
+        for bit in range(8):
+            ones = sum(weight for value, weight in enumerate(weights) if value >> bit & 1)
+            if 2 * ones > total:  # more weight on 1 than on 0
+                fingerprint |= 1 << (position * 8 + bit)
+    return fingerprint
+
+
+def hamming_distance(a, b) -> int:
+    return bin(a ^ b).count("1")
+
+
+class SimHashIndex(object):
+    """
+    Fingerprints of every page seen, stored in the pages table of a SQLite
+    database, with an in-memory index answering whether any stored
+    fingerprint is within max_distance bits of a new one.
+
+    The 64 bits are split into max_distance + 1 bands. Two fingerprints at
+    most max_distance bits apart agree on at least one whole band, so only
+    fingerprints sharing a band value with the query are compared, instead
+    of every stored fingerprint.
+    """
+
+    def __init__(self, path, max_distance=3, batch_size=100, interval=5.0):
+        self.max_distance = max_distance
+        self.band_bits = -(-BITS // (max_distance + 1))  # ceil
+        self.bands = [dict() for _ in range(max_distance + 1)]  # format: [{band value: [fingerprint, ...], ...}, ...]
+        self.count = 0
+        self.lock = Lock()
+        self.batch_size = batch_size
+        self.interval = interval
+        self.unsaved = list()
+        self.last_commit = time.time()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS pages(hash)")
+        for (fingerprint,) in self.db.execute("SELECT hash FROM pages"):
+            if isinstance(fingerprint, int):  # skip rows left by older versions
+                self._index(fingerprint & (1 << BITS) - 1)
+
+    def __len__(self):
+        return self.count
+
+    def find(self, fingerprint):
+        """
+        Return a stored fingerprint within max_distance bits of fingerprint, or None.
+        """
+        for band, value in zip(self.bands, self._band_values(fingerprint)):
+            for candidate in band.get(value, ()):
+                if hamming_distance(candidate, fingerprint) <= self.max_distance:
+                    return candidate
+        return None
+
+    def add(self, fingerprint) -> bool:
+        """
+        Store fingerprint unless a near duplicate is already stored.
+        Return True if it was a near duplicate.
+        """
+        with self.lock:
+            if self.find(fingerprint) is not None:
+                return True
+            self._index(fingerprint)
+            # SQLite integers are signed 64-bit.
+            self.unsaved.append((fingerprint - (1 << BITS) if fingerprint >> (BITS - 1) else fingerprint,))
+            if (len(self.unsaved) >= self.batch_size or
+                    time.time() - self.last_commit >= self.interval):
+                self._commit()
+            return False
+
+    def flush(self):
+        with self.lock:
+            self._commit()
+
+    def _commit(self):
+        if self.unsaved:
+            with self.db:
+                self.db.executemany("INSERT INTO pages(hash) VALUES (?)", self.unsaved)
+            self.unsaved.clear()
+        self.last_commit = time.time()
+
+    def _index(self, fingerprint):
+        self.count += 1
+        for band, value in zip(self.bands, self._band_values(fingerprint)):
+            band.setdefault(value, []).append(fingerprint)
+
+    def _band_values(self, fingerprint):
+        mask = (1 << self.band_bits) - 1
+        return [fingerprint >> (i * self.band_bits) & mask for i in range(len(self.bands))]
@@ -0,0 +1,121 @@
+import os
+import time
+
+from queue import Queue, Empty
+from threading import Thread
+
+from utils.wordcount import TopWords
+
+
+class CrawlStats(object):
+    """
+    In-memory aggregate of the report statistics: the most common words,
+    the longest page, the ics.uci.edu subdomains, the number of unique pages
+    and the SimHash log. write() saves them to the report files.
+    """
+
+    def __init__(self, freq_sketch_width=None):
+        self.words = TopWords(50, freq_sketch_width)
+        self.longest = ()  # ( format: page, number of words )
+        self.subdomains = dict()  # format: {"subdomain": count, ...}
+        self.unique = 0
+        self.similarity_log = list()  # lines not yet appended to SimHashLog.txt
+
+    def add_words(self, tokens):
+        self.words.update(tokens)
+
+    def update_longest(self, page, length):
+        if not self.longest or length > self.longest[1]:
+            self.longest = (page, length)
+
+    def add_subdomain(self, subdomain):
+        self.subdomains[subdomain] = self.subdomains.get(subdomain, 0) + 1
+
+    def set_unique(self, count):
+        self.unique = count
+
+    def log_similarity(self, url, similar):
+        self.similarity_log.append(f"{url} : Page {'Similar' if similar else 'Not Similar'}\n")
+
+    def write(self, directory="."):
+        """
+        Save the statistics to the report files in directory. Every file is
+        replaced atomically, so a crash leaves either the old or the new one.
+        """
+        top50 = "Top 50 Words:\n" + "".join(
+            f"{word}: {freq}\n" for word, freq in self.words.most_common(50))
+        _replace(os.path.join(directory, "top50.txt"), top50)
+        if self.longest:
+            _replace(os.path.join(directory, "longest.txt"),
+                     f"Longest page: {self.longest[0]}\nLength: {self.longest[1]}")
+        _replace(os.path.join(directory, "subdomains.txt"),
+                 f"# of subdomains: {len(self.subdomains)}\n" + "".join(
+                     f"\t{sd}: {freq}\n" for sd, freq in self.subdomains.items()))
+        _replace(os.path.join(directory, "unique.txt"),
+                 f"Amount of unique pages: {self.unique}")
+        if self.similarity_log:
+            with open(os.path.join(directory, "SimHashLog.txt"), "a") as f:
+                f.writelines(self.similarity_log)
+                f.flush()
+                os.fsync(f.fileno())
+            self.similarity_log.clear()
+
+
+class StatsWriter(Thread):
+    """
+    Owns a CrawlStats and applies updates to it from a queue, so the threads
+    submitting them never wait on the report files. The files are written
+    every interval seconds when something changed, and once more by close().
+
+    submit("add_words", tokens) calls stats.add_words(tokens) on this thread.
+    """
+
+    _STOP = object()
+
+    def __init__(self, stats, interval=5.0, directory="."):
+        self.stats = stats
+        self.interval = interval
+        self.directory = directory
+        self.queue = Queue()
+        super().__init__(daemon=True)
+
+    def submit(self, method, *args):
+        self.queue.put((method, args))
+
+    def run(self):
+        changed = False
+        next_write = time.time() + self.interval
+        while True:
+            try:
+                item = self.queue.get(timeout=max(0, next_write - time.time()))
+            except Empty:
+                item = None
+            if item is self._STOP:
+                break
+            if item is not None:
+                method, args = item
+                getattr(self.stats, method)(*args)
+                changed = True
+            if time.time() >= next_write:
+                if changed:
+                    self.stats.write(self.directory)
+                    changed = False
+                next_write = time.time() + self.interval
+        self.stats.write(self.directory)
+
+    def close(self):
+        """
+        Apply every update still queued, write the files and stop the thread.
+        """
+        if self.is_alive():
+            self.queue.put(self._STOP)
+            self.join()
+
+
+def _replace(path, text):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
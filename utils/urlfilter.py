@@ -0,0 +1,84 @@
+from hashlib import sha256
+from urllib.parse import urlsplit
+
+
+class URLFilter(object):
+    """
+    Rules deciding which urls may be crawled, prepared once for fast checks:
+
+    - the scheme must be one of schemes,
+    - the hostname must be one of domains or a subdomain of one, checked
+      by looking up each suffix of the hostname in a set,
+    - no path segment may start with one of invalid_path_prefixes,
+    - the path may not end in "." followed by one of invalid_extensions,
+      checked by looking up the part after the last "." in a set.
+
+    Checks have no side effects, so a URLFilter can be shared by threads
+    or pickled into worker processes.
+    """
+
+    def __init__(self, domains, invalid_path_prefixes, invalid_extensions,
+                 schemes=("http", "https"), version=1):
+        self.domains = frozenset(domain.strip(".").lower() for domain in domains)
+        self.invalid_path_prefixes = tuple(sorted(invalid_path_prefixes))
+        self.invalid_extensions = frozenset(invalid_extensions)
+        self.schemes = frozenset(schemes)
+        self.version = version
+
+    def fingerprint(self) -> str:
+        """
+        Return a digest of the rules, which changes whenever they do.
+        """
+        rules = repr((self.version, sorted(self.domains), self.invalid_path_prefixes,
+                      sorted(self.invalid_extensions), sorted(self.schemes)))
+        return sha256(rules.encode()).hexdigest()
+
+    def is_valid(self, url) -> bool:
+        if not isinstance(url, str):
+            return False
+        parsed = urlsplit(url)
+        return (parsed.scheme in self.schemes and
+                self.allows_host(parsed.hostname) and
+                self.allows_path(parsed.path))
+
+    def is_valid_many(self, urls) -> list:
+        """
+        Check a batch of urls, such as all the links of a page, and return
+        a list of booleans in the same order. Hosts repeat a lot within a
+        batch, so each one is only looked up once.
+        """
+        hosts = dict()  # format: {"hostname": allowed, ...}
+        valid = []
+        for url in urls:
+            if not isinstance(url, str):
+                valid.append(False)
+                continue
+            parsed = urlsplit(url)
+            if parsed.scheme not in self.schemes:
+                valid.append(False)
+                continue
+            hostname = parsed.hostname
+            if hostname not in hosts:
+                hosts[hostname] = self.allows_host(hostname)
+            valid.append(hosts[hostname] and self.allows_path(parsed.path))
+        return valid
+
+    def allows_host(self, hostname) -> bool:
+        if not hostname:
+            return False
+        while True:
+            if hostname in self.domains:
+                return True
+            dot = hostname.find(".")
+            if dot < 0:
+                return False
+            hostname = hostname[dot + 1:]
+
+    def allows_path(self, path) -> bool:
+        path = path.lower()
+        if self.invalid_path_prefixes:
+            for segment in path.split("/")[1:]:
+                if segment.startswith(self.invalid_path_prefixes):
+                    return False
+        # urlsplit leaves ";params" on the last segment, as in "/a.pdf;v=1".
+        return path.rpartition(".")[2].partition(";")[0] not in self.invalid_extensions
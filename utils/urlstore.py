@@ -0,0 +1,31 @@
+from threading import Lock
+
+
+class SeenURLs(object):
+    """
+    Set of URLs that have already been seen, compared by a canonical key.
+    The key is computed once when a URL is added or looked up, so checking a
+    URL against the store takes constant time however many URLs it holds.
+    """
+
+    def __init__(self, key=None):
+        self.key = key if key else (lambda url: url)
+        self.keys = set()
+        self.lock = Lock()
+
+    def add(self, url) -> bool:
+        """
+        Add url to the store and return True if it had not been seen before.
+        """
+        key = self.key(url)
+        with self.lock:
+            if key in self.keys:
+                return False
+            self.keys.add(key)
+            return True
+
+    def __contains__(self, url):
+        return self.key(url) in self.keys
+
+    def __len__(self):
+        return len(self.keys)
@@ -0,0 +1,85 @@
+from array import array
+from collections import Counter
+from hashlib import blake2b
+from threading import Lock
+
+
+class CountMinSketch(object):
+    """
+    Approximate counts in depth * width counters, whatever the number of
+    distinct words. Estimates never undercount, and overcount by at most
+    about total / width with high probability.
+    """
+
+    def __init__(self, width, depth=4):
+        self.width = width
+        self.rows = [array("Q", bytes(8 * width)) for _ in range(depth)]
+
+    def add(self, word, count) -> int:
+        """
+        Add count to word and return its new estimate.
+        """
+        digest = blake2b(word.encode(), digest_size=4 * len(self.rows)).digest()
+        cells = [int.from_bytes(digest[4 * i:4 * i + 4], "little") % self.width
+                 for i in range(len(self.rows))]
+        # Conservative update: only raise the counters that are too low.
+        estimate = min(row[cell] for row, cell in zip(self.rows, cells)) + count
+        for row, cell in zip(self.rows, cells):
+            if row[cell] < estimate:
+                row[cell] = estimate
+        return estimate
+
+
+class TopWords(object):
+    """
+    Word frequencies of the whole crawl with the k most frequent words
+    maintained as pages are added, so getting the top k never sorts the
+    whole vocabulary.
+
+    By default every word is counted exactly. With sketch_width, counts are
+    kept in a CountMinSketch instead and memory stays bounded however large
+    the vocabulary grows; only the top k words and their estimated counts
+    are stored.
+    """
+
+    def __init__(self, k=50, sketch_width=None):
+        self.k = k
+        self.counts = Counter() if sketch_width is None else None
+        self.sketch = CountMinSketch(sketch_width) if sketch_width else None
+        self.top = dict()  # format: {"word": count, ...} of at most k words
+        self.floor = None  # word with the lowest count in top, once top is full
+        self.lock = Lock()
+
+    def update(self, tokens):
+        """
+        Count the tokens of one page, given as a list or a Counter.
+        """
+        page_counts = Counter(tokens)
+        with self.lock:
+            if self.counts is not None:
+                self.counts.update(page_counts)
+            for word, count in page_counts.items():
+                total = self.counts[word] if self.counts is not None else self.sketch.add(word, count)
+                self._offer(word, total)
+
+    def most_common(self, n=None):
+        with self.lock:
+            items = sorted(self.top.items(), key=lambda item: (-item[1], item[0]))
+        return items[:n] if n is not None else items
+
+    def __len__(self):
+        return len(self.counts) if self.counts is not None else len(self.top)
+
+    def _offer(self, word, count):
+        if word in self.top:
+            self.top[word] = count
+            if word == self.floor:
+                self.floor = min(self.top, key=self.top.get)
+        elif len(self.top) < self.k:
+            self.top[word] = count
+            if len(self.top) == self.k:
+                self.floor = min(self.top, key=self.top.get)
+        elif count > self.top[self.floor]:
+            del self.top[self.floor]
+            self.top[word] = count
+            self.floor = min(self.top, key=self.top.get)